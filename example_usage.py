@@ -4,49 +4,81 @@ Example usage of the Kitchen Renovation Template
 Demonstrates how the AI would use the trade library to generate estimates
 """
 
-import json
+import os
+import re
+import sys
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    from json import loads as json_loads
+
+
+@lru_cache(maxsize=8)
+def _load_template(template_path, mtime_ns):
+    """Load and parse template JSON, cached per path and modification time"""
+    with open(template_path, 'rb') as f:
+        return json_loads(f.read())
+
+
 class EstimateGenerator:
     """AI Estimate Generator using Trade Library Templates"""
     
+    # Keyword classifiers, checked in order; the first matching tier wins
+    _SIZE_PATTERNS = (
+        (re.compile('small|galley|tiny'), 'small'),
+        (re.compile('large|big|spacious'), 'large'),
+        (re.compile('xl|luxury|massive'), 'xl'),
+    )
+    _SCOPE_PATTERNS = (
+        (re.compile('cosmetic|refresh|update|paint|reface'), 'cosmetic'),
+        (re.compile('gut|complete|full|tear down|rebuild'), 'gut_renovation'),
+    )
+    _QUALITY_PATTERNS = (
+        (re.compile('budget|cheap|basic|affordable'), 'budget'),
+        (re.compile('luxury|high-end|premium|custom'), 'luxury'),
+        (re.compile('high|nice|good quality'), 'high_end'),
+    )
+    
     def __init__(self, template_path):
         """Initialize with template"""
-        with open(template_path, 'r') as f:
-            self.template = json.load(f)
+        # Parsed templates are shared between instances; keying on mtime
+        # picks up edits to the file without a restart
+        template_path = str(template_path)
+        self.template = _load_template(template_path, os.stat(template_path).st_mtime_ns)
+        
+        # Typical hourly rate by category, looked up once per labor task
+        self._rate_by_category = {
+            category: rates['typical'] for category, rates in self.template['labor_rates'].items()
+        }
+        
+        # Pre-compute raw labor hours and material cost per phase once;
+        # they depend only on the template, not on the parsed parameters
+        self._phase_totals = {
+            phase['phase_id']: self._sum_phase(phase) for phase in self.template['phases']
+        }
+    
+    @staticmethod
+    def _sum_phase(phase):
+        """Return (labor_hours, material_cost) totals for a phase"""
+        labor_hours = sum(task.get('labor_hours', 0) for task in phase.get('tasks', []))
+        material_cost = sum(
+            material.get('quantity', 0) * material.get('unit_cost_base', 0) * (1 + material.get('waste_factor', 0))
+            for material in phase.get('materials', [])
+        )
+        return labor_hours, material_cost
     
     def parse_natural_language(self, description):
         """Parse natural language description into parameters"""
         # This would be AI-powered in real implementation
         description = description.lower()
         
-        # Determine kitchen size
-        if any(word in description for word in ['small', 'galley', 'tiny']):
-            kitchen_size = 'small'
-        elif any(word in description for word in ['large', 'big', 'spacious']):
-            kitchen_size = 'large'  
-        elif any(word in description for word in ['xl', 'luxury', 'massive']):
-            kitchen_size = 'xl'
-        else:
-            kitchen_size = 'medium'
-        
-        # Determine renovation scope
-        if any(word in description for word in ['cosmetic', 'refresh', 'update', 'paint', 'reface']):
-            scope = 'cosmetic'
-        elif any(word in description for word in ['gut', 'complete', 'full', 'tear down', 'rebuild']):
-            scope = 'gut_renovation'
-        else:
-            scope = 'standard'
-        
-        # Determine quality tier
-        if any(word in description for word in ['budget', 'cheap', 'basic', 'affordable']):
-            quality = 'budget'
-        elif any(word in description for word in ['luxury', 'high-end', 'premium', 'custom']):
-            quality = 'luxury'
-        elif any(word in description for word in ['high', 'nice', 'good quality']):
-            quality = 'high_end'
-        else:
-            quality = 'mid_range'
+        kitchen_size = self._classify(description, self._SIZE_PATTERNS, 'medium')
+        scope = self._classify(description, self._SCOPE_PATTERNS, 'standard')
+        quality = self._classify(description, self._QUALITY_PATTERNS, 'mid_range')
         
         return {
             'kitchen_size': kitchen_size,
@@ -54,6 +86,14 @@ class EstimateGenerator:
             'quality_tier': quality
         }
     
+    @staticmethod
+    def _classify(description, patterns, default):
+        """Return the value of the first pattern found in description"""
+        for pattern, value in patterns:
+            if pattern.search(description):
+                return value
+        return default
+    
     def generate_estimate(self, natural_language_input):
         """Generate detailed estimate from natural language"""
         
@@ -88,11 +128,9 @@ class EstimateGenerator:
             phase_items = self._process_phase(phase, params, size_factor, quality_factor)
             line_items.extend(phase_items)
             
-            for item in phase_items:
-                if item['category'] == 'labor':
-                    total_labor_hours += item['hours']
-                else:
-                    total_material_cost += item['total_cost']
+            phase_hours, phase_material_cost = self._phase_totals[phase['phase_id']]
+            total_labor_hours += phase_hours
+            total_material_cost += phase_material_cost
         
         # Apply complexity multipliers
         complexity = size_factor['complexity_multiplier'] * scope_factor['complexity_multiplier']
@@ -132,19 +170,27 @@ class EstimateGenerator:
         
         # Process tasks (labor)
         for task in phase.get('tasks', []):
+            hours = task.get('labor_hours', 0)
+            rate = self._rate_by_category[task.get('hourly_rate_category', 'skilled')]
+            
             items.append({
                 'category': 'labor',
                 'phase': phase['phase_name'],
                 'description': task['task'],
-                'hours': task.get('labor_hours', 0),
-                'rate': self.template['labor_rates'][task.get('hourly_rate_category', 'skilled')]['typical'],
-                'total_cost': task.get('labor_hours', 0) * self.template['labor_rates'][task.get('hourly_rate_category', 'skilled')]['typical']
+                'hours': hours,
+                'rate': rate,
+                'total_cost': hours * rate
             })
         
         # Process materials  
         for material in phase.get('materials', []):
             quantity = material.get('quantity', 0)
             unit_cost = material.get('unit_cost_base', 0)
+            
+            # Skip placeholder rows that contribute nothing to the estimate
+            if not (quantity and unit_cost):
+                continue
+            
             waste_factor = material.get('waste_factor', 0)
             
             items.append({
@@ -163,54 +209,50 @@ class EstimateGenerator:
     def _print_detailed_estimate(self, line_items, totals):
         """Print formatted estimate"""
         
-        print(f"📊 DETAILED ESTIMATE")
-        print("="*80)
+        # Build the report up front and emit it with a single write
+        parts = []
+        parts.append(f"📊 DETAILED ESTIMATE")
+        parts.append("="*80)
         
         # Group by phase
-        phases = {}
+        phases = defaultdict(lambda: {'labor': [], 'materials': []})
         for item in line_items:
-            phase = item['phase']
-            if phase not in phases:
-                phases[phase] = {'labor': [], 'materials': []}
-            
-            if item['category'] == 'labor':
-                phases[phase]['labor'].append(item)
-            else:
-                phases[phase]['materials'].append(item)
+            phases[item['phase']]['labor' if item['category'] == 'labor' else 'materials'].append(item)
         
         # Print each phase
         for phase_name, items in phases.items():
-            print(f"\n🔨 {phase_name}")
-            print("-" * 60)
+            parts.append(f"\n🔨 {phase_name}")
+            parts.append("-" * 60)
             
             # Labor items
             if items['labor']:
-                print("Labor:")
+                parts.append("Labor:")
                 for item in items['labor']:
-                    print(f"  • {item['description']:<40} {item['hours']:>3.0f} hrs @ ${item['rate']:>2.0f}/hr = ${item['total_cost']:>6,.0f}")
+                    parts.append(f"  • {item['description']:<40} {item['hours']:>3.0f} hrs @ ${item['rate']:>2.0f}/hr = ${item['total_cost']:>6,.0f}")
             
             # Material items  
             if items['materials']:
-                print("Materials:")
+                parts.append("Materials:")
                 for item in items['materials']:
-                    if item['total_cost'] > 0:
-                        print(f"  • {item['description']:<40} ${item['total_cost']:>6,.0f}")
+                    parts.append(f"  • {item['description']:<40} ${item['total_cost']:>6,.0f}")
         
         # Totals
-        print("\n" + "="*80)
-        print("ESTIMATE SUMMARY")
-        print("="*80)
-        print(f"Base Labor Hours:      {totals['raw_hours']:>8.0f}")
-        print(f"Complexity Multiplier: {totals['complexity_multiplier']:>8.1f}x")
-        print(f"Adjusted Labor Hours:  {totals['adjusted_hours']:>8.0f}")
-        print(f"Labor Cost:            ${totals['labor_cost']:>8,.0f}")
-        print("-" * 40)
-        print(f"Base Material Cost:    ${totals['material_cost']/totals['quality_multiplier']:>8,.0f}")
-        print(f"Quality Multiplier:    {totals['quality_multiplier']:>8.1f}x") 
-        print(f"Adjusted Materials:    ${totals['material_cost']:>8,.0f}")
-        print("="*40)
-        print(f"TOTAL PROJECT COST:    ${totals['total_cost']:>8,.0f}")
-        print("="*40)
+        parts.append("\n" + "="*80)
+        parts.append("ESTIMATE SUMMARY")
+        parts.append("="*80)
+        parts.append(f"Base Labor Hours:      {totals['raw_hours']:>8.0f}")
+        parts.append(f"Complexity Multiplier: {totals['complexity_multiplier']:>8.1f}x")
+        parts.append(f"Adjusted Labor Hours:  {totals['adjusted_hours']:>8.0f}")
+        parts.append(f"Labor Cost:            ${totals['labor_cost']:>8,.0f}")
+        parts.append("-" * 40)
+        parts.append(f"Base Material Cost:    ${totals['material_cost']/totals['quality_multiplier']:>8,.0f}")
+        parts.append(f"Quality Multiplier:    {totals['quality_multiplier']:>8.1f}x") 
+        parts.append(f"Adjusted Materials:    ${totals['material_cost']:>8,.0f}")
+        parts.append("="*40)
+        parts.append(f"TOTAL PROJECT COST:    ${totals['total_cost']:>8,.0f}")
+        parts.append("="*40)
+        
+        sys.stdout.write("\n".join(parts) + "\n")
 
 
 def main():
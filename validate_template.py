@@ -4,15 +4,19 @@ Template validation script for trade library
 Validates JSON structure and calculates sample estimates
 """
 
-import json
 import sys
 from pathlib import Path
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 def load_template(template_path):
     """Load and parse template JSON"""
     try:
-        with open(template_path, 'r') as f:
-            return json.load(f)
+        with open(template_path, 'rb') as f:
+            return json_loads(f.read())
     except Exception as e:
         print(f"Error loading template: {e}")
         return None
@@ -61,6 +65,15 @@ def validate_phases(phases):
     print(f"  📦 Total material categories: {total_materials}")
     return True
 
+def sum_phase_costs(phase):
+    """Return (labor_hours, material_cost) totals for a single phase"""
+    labor_hours = sum(task.get('labor_hours', 0) for task in phase.get('tasks', []))
+    material_cost = sum(
+        material.get('quantity', 0) * material.get('unit_cost_base', 0) * (1 + material.get('waste_factor', 0))
+        for material in phase.get('materials', [])
+    )
+    return labor_hours, material_cost
+
 def calculate_sample_estimate(template, kitchen_size="medium", scope="standard"):
     """Calculate a sample estimate using template data"""
     
@@ -79,35 +92,16 @@ def calculate_sample_estimate(template, kitchen_size="medium", scope="standard")
     else:
         included_phases = [p for p in template['phases'] if p['phase_id'] in phases_to_include]
     
-    # Calculate totals
-    total_labor_hours = 0
-    total_material_cost = 0
+    # Calculate per-phase subtotals, then reduce them into totals
+    phase_costs = [sum_phase_costs(phase) for phase in included_phases]
+    total_labor_hours = sum(hours for hours, _ in phase_costs)
+    total_material_cost = sum(cost for _, cost in phase_costs)
     labor_rates = template['labor_rates']
     
     print(f"\n🧮 Sample Estimate: {kitchen_size.title()} Kitchen, {scope.title()} Renovation")
     print("=" * 60)
     
-    for phase in included_phases:
-        phase_labor_hours = 0
-        phase_material_cost = 0
-        
-        # Sum labor hours for phase
-        for task in phase.get('tasks', []):
-            hours = task.get('labor_hours', 0)
-            phase_labor_hours += hours
-        
-        # Sum material costs for phase  
-        for material in phase.get('materials', []):
-            quantity = material.get('quantity', 0)
-            unit_cost = material.get('unit_cost_base', 0)
-            waste_factor = material.get('waste_factor', 0)
-            
-            material_cost = quantity * unit_cost * (1 + waste_factor)
-            phase_material_cost += material_cost
-        
-        total_labor_hours += phase_labor_hours
-        total_material_cost += phase_material_cost
-        
+    for phase, (phase_labor_hours, phase_material_cost) in zip(included_phases, phase_costs):
         print(f"Phase {phase['sequence']}: {phase['phase_name']}")
         print(f"  Labor: {phase_labor_hours:>3.0f} hours")
         print(f"  Materials: ${phase_material_cost:>8,.0f}")